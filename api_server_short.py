@@ -3,40 +3,55 @@ Optimized Flask-based Quantum-Secure Communication API Server.
 Maintains full quantum security features with alternative implementation strategies.
 """
 
-from flask import Flask, request, jsonify, send_from_directory, make_response
+from flask import Flask, request, send_from_directory, make_response
 from flask_cors import CORS
 import traceback
-import random
-import base64
+import binascii
+import bisect
 import os
+import secrets
 import numpy as np
-from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
+import orjson
+from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 from Crypto.Cipher import DES
-from Crypto.Util.Padding import pad, unpad
-from concurrent.futures import ThreadPoolExecutor
+import itertools
 import threading
-from functools import lru_cache
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"]}})
 
+_rng = np.random.default_rng()
+
+_CORS_PREFLIGHT_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS"
+}
+
 def _build_cors_preflight_response():
-    response = make_response()
-    response.headers.add("Access-Control-Allow-Origin", "*")
-    response.headers.add("Access-Control-Allow-Headers", "Content-Type")
-    response.headers.add("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-    return response
+    return make_response(("", 204, _CORS_PREFLIGHT_HEADERS))
 
-def _build_cors_actual_response(response_body):
-    response = jsonify(response_body)
-    response.headers.add("Access-Control-Allow-Origin", "*")
+def _json(obj):
+    """Serialize a response body with orjson instead of Flask's stdlib encoder"""
+    return app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+@app.after_request
+def _add_cors_origin(response):
+    """Set the CORS origin header once for every response"""
+    response.headers.setdefault("Access-Control-Allow-Origin", "*")
     return response
 
-# Thread-safe cache with locks
+# Thread-safe cache: single dict reads and assignments are atomic under the GIL,
+# so only compound updates take the lock
 class ThreadSafeCache:
     def __init__(self):
-        self._cache = {
+        self._cache = self._empty()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _empty():
+        return {
             "keys": {
                 "classic": None,
                 "quantum": None,
@@ -46,163 +61,156 @@ class ThreadSafeCache:
             "measurements": {},
             "qber_history": []
         }
-        self._lock = threading.Lock()
     
     def get(self, key, subkey=None):
-        with self._lock:
-            if subkey:
-                if key not in self._cache or not isinstance(self._cache[key], dict):
-                    return None
-                return self._cache[key].get(subkey)
-            return self._cache.get(key)
+        entry = self._cache.get(key)
+        if subkey:
+            if not isinstance(entry, dict):
+                return None
+            return entry.get(subkey)
+        return entry
     
     def set(self, key, subkey, value=None):
         """Set a value in the cache. If value is None, treat subkey as the value and ignore any third parameter."""
+        if value is None:
+            # Two-parameter version: set(key, value)
+            self._cache[key] = subkey
+            return
+        # Three-parameter version: set(key, subkey, value)
+        entry = self._cache.get(key)
+        if isinstance(entry, dict):
+            entry[subkey] = value
+            return
         with self._lock:
-            if value is None:
-                # Two-parameter version: set(key, value)
-                self._cache[key] = subkey
-            else:
-                # Three-parameter version: set(key, subkey, value)
-                if key not in self._cache:
-                    self._cache[key] = {}
-                if not isinstance(self._cache[key], dict):
-                    self._cache[key] = {}
-                self._cache[key][subkey] = value
+            # Creating the nested dict is a read-modify-write, so re-check under the lock
+            entry = self._cache.get(key)
+            if not isinstance(entry, dict):
+                entry = self._cache[key] = {}
+            entry[subkey] = value
+    
+    def get_key(self, name):
+        """Return a cached key as (bits, packed, messages), or Nones if it is not set."""
+        return self.get("keys", name) or (None, None, None)
+    
+    def set_key(self, name, bits, packed=None):
+        """Cache a key's bit list, 64-bit packed form and message counter in one assignment."""
+        # Storing them in a single entry means a reader never pairs one key's bits
+        # with another key's packed form or counter, even while other requests
+        # replace it. next() on an itertools.count is atomic under the GIL
+        if packed is None:
+            packed = _pack_key_int(bits)
+        entry = (bits, packed, itertools.count())
+        self.set("keys", name, entry)
+        return entry
     
     def clear(self):
-        with self._lock:
-            self.__init__()
+        self._cache = self._empty()
 
 cache = ThreadSafeCache()
 
-# Quantum Circuit Pool for reuse
-class QuantumCircuitPool:
-    def __init__(self, pool_size=5):
-        self.pool_size = pool_size
-        self.simulator = AerSimulator()
-        self.circuits = []
-        self.lock = threading.Lock()
-        self._initialize_pool()
-    
-    def _initialize_pool(self):
-        for _ in range(self.pool_size):
-            qr = QuantumRegister(2, 'q')
-            cr = ClassicalRegister(2, 'c')
-            qc = QuantumCircuit(qr, cr)
-            qc.h(qr[0])
-            qc.cx(qr[0], qr[1])
-            self.circuits.append(qc)
-    
-    def get_circuit(self):
-        with self.lock:
-            if not self.circuits:
-                self._initialize_pool()
-            return self.circuits.pop() if self.circuits else self._create_new_circuit()
-    
-    def _create_new_circuit(self):
-        qr = QuantumRegister(2, 'q')
-        cr = ClassicalRegister(2, 'c')
-        qc = QuantumCircuit(qr, cr)
-        qc.h(qr[0])
-        qc.cx(qr[0], qr[1])
-        return qc
-    
-    def return_circuit(self, circuit):
-        with self.lock:
-            if len(self.circuits) < self.pool_size:
-                circuit.data.clear()
-                circuit.h(circuit.qubits[0])
-                circuit.cx(circuit.qubits[0], circuit.qubits[1])
-                self.circuits.append(circuit)
+def _pack_key_bits(bits):
+    """Pack the first 64 key bits into an 8-byte DES key, zero-padding short keys"""
+    # packbits zero-fills a trailing partial byte; ljust supplies any missing whole bytes
+    return np.packbits(np.asarray(bits[:64], dtype=np.uint8)).tobytes().ljust(8, b"\0")
 
-circuit_pool = QuantumCircuitPool()
+def _pack_key_int(bits):
+    """Pack the first 64 key bits into an int, so two keys compare with one popcount"""
+    return int.from_bytes(_pack_key_bits(bits), "big")
 
 class OptimizedQuantumDES:
     """Optimized DES implementation with quantum key handling"""
     def __init__(self, key_bits):
-        # Convert bits to bytes for DES key (use first 64 bits or pad if shorter)
-        key_bytes = []
-        bits = key_bits + [0] * (64 - len(key_bits))  # Pad to 64 bits if needed
-        for i in range(0, 64, 8):
-            byte = 0
-            for j in range(8):
-                byte = (byte << 1) | bits[i + j]
-            key_bytes.append(byte)
-        self.key = bytes(key_bytes)
+        self.key = _pack_key_bits(key_bits)
+
+    # CTR mode: half of the 8-byte counter block is a per-message nonce, prepended
+    # to the ciphertext, and the other half counts blocks, so no padding is needed.
+    # The nonce is the key's message number rather than random bytes (4 random
+    # bytes would likely repeat after ~2**16 messages and reuse keystream): a key
+    # encrypts at most MAX_MESSAGES messages, and the server rotates it before it
+    # runs out. CTR is not authenticated: a wrong key or tampered ciphertext
+    # decrypts to garbage, which is only rejected if it is not valid UTF-8
+    NONCE_SIZE = DES.block_size // 2
+    MAX_MESSAGES = 2 ** (8 * NONCE_SIZE)
 
-    def encrypt(self, message):
-        cipher = DES.new(self.key, DES.MODE_ECB)
-        padded_data = pad(message.encode(), DES.block_size)
-        encrypted = cipher.encrypt(padded_data)
-        return base64.b64encode(encrypted).decode()
+    def encrypt(self, message, message_number):
+        nonce = message_number.to_bytes(self.NONCE_SIZE, "big")
+        cipher = DES.new(self.key, DES.MODE_CTR, nonce=nonce)
+        encrypted = cipher.nonce + cipher.encrypt(message.encode())
+        return binascii.b2a_base64(encrypted, newline=False).decode('ascii')
 
     def decrypt(self, encrypted_message):
-        cipher = DES.new(self.key, DES.MODE_ECB)
-        encrypted = base64.b64decode(encrypted_message)
-        decrypted = cipher.decrypt(encrypted)
-        return unpad(decrypted, DES.block_size).decode()
+        # CTR has no padding to reject malformed input, so validate it explicitly
+        encrypted = binascii.a2b_base64(encrypted_message, strict_mode=True)
+        if len(encrypted) < self.NONCE_SIZE:
+            raise ValueError("ciphertext is shorter than its nonce")
+        nonce, ciphertext = encrypted[:self.NONCE_SIZE], encrypted[self.NONCE_SIZE:]
+        cipher = DES.new(self.key, DES.MODE_CTR, nonce=nonce)
+        return cipher.decrypt(ciphertext).decode()
 
-def calculate_qber(key1, key2):
-    """Calculate quantum bit error rate"""
-    if not key1 or not key2 or len(key1) != len(key2):
+def _classic_key_bits():
+    """Draw a 64-bit classic key from the OS CSPRNG as a uint8 bit array"""
+    return np.unpackbits(np.frombuffer(secrets.token_bytes(8), dtype=np.uint8))
+
+def calculate_qber(packed1, packed2, length=64):
+    """Calculate quantum bit error rate of two keys packed with _pack_key_int"""
+    if packed1 is None or packed2 is None:
         return 0.0
-    return sum(1 for a, b in zip(key1, key2) if a != b) / len(key1)
+    return (packed1 ^ packed2).bit_count() / length
+
+_AER = AerSimulator()
+
+# Measured Bell circuit, transpiled once at import and shared read-only by all
+# request threads (Aer's run does not mutate it)
+_BELL_QC = QuantumCircuit(2, 2)
+_BELL_QC.h(0)
+_BELL_QC.cx(0, 1)
+_BELL_QC.measure([0, 1], [0, 1])
+_BELL_TQC = transpile(_BELL_QC, _AER)
 
 def generate_quantum_key(length=64):
     """Generate simulated quantum key"""
-    simulator = AerSimulator()
-    key = []
-    circuit = circuit_pool.get_circuit()
-    
-    for _ in range(length):
-        circuit.measure_all()
-        result = simulator.run(circuit).result()
-        counts = result.get_counts(circuit)
-        # Get the most common measurement result
-        measurement = max(counts.items(), key=lambda x: x[1])[0]
-        key.append(int(measurement[0]))  # Take first bit
-        circuit.data.clear()  # Reset circuit
-        circuit.h(circuit.qubits[0])
-        circuit.cx(circuit.qubits[0], circuit.qubits[1])
-        
-    circuit_pool.return_circuit(circuit)
-    return key
+    # Sample all bits in a single run instead of one simulator call per bit;
+    # memory=True keeps the per-shot outcomes in sampling order
+    memory = _AER.run(_BELL_TQC, shots=length, memory=True).result().get_memory()
+    return [int(shot[0]) for shot in memory]
 
 @app.route('/init_keys', methods=['GET', 'POST', 'OPTIONS'])
 def init_keys():
-    """Initialize keys with parallel processing"""
+    """Initialize classic, quantum and Eve keys"""
     if request.method == "OPTIONS":
         return _build_cors_preflight_response()
     try:
-        # Generate classic and quantum keys in parallel
-        with ThreadPoolExecutor() as executor:
-            classic_future = executor.submit(lambda: [random.randint(0, 1) for _ in range(64)])
-            quantum_future = executor.submit(generate_quantum_key)
-            eve_future = executor.submit(generate_quantum_key)
-            
-            classic_key = classic_future.result()
-            quantum_key = quantum_future.result()
-            eve_bits = eve_future.result()
+        # Each generator is a single batched call, so a thread pool only adds overhead
+        classic_key = _classic_key_bits().tolist()
+        quantum_key = generate_quantum_key()
+        eve_bits = generate_quantum_key()
+        
+        # Pack each key once; the cache and the QBER share the packed forms
+        quantum_packed = _pack_key_int(quantum_key)
+        eve_packed = _pack_key_int(eve_bits)
         
         # Calculate QBER
-        qber = calculate_qber(quantum_key, eve_bits)
+        qber = calculate_qber(quantum_packed, eve_packed)
         
         # Update cache
-        cache.set("keys", "classic", classic_key)
-        cache.set("keys", "quantum", quantum_key)
-        cache.set("keys", "eve", eve_bits)
+        cache.set_key("classic", classic_key)
+        cache.set_key("quantum", quantum_key, quantum_packed)
+        cache.set_key("eve", eve_bits, eve_packed)
         
-        return _build_cors_actual_response({
+        return _json({
             "classic_key": classic_key,
             "quantum_key": quantum_key,
             "qber": qber
         })
     except Exception as e:
-        error_msg = f"Error: {str(e)}\n{traceback.format_exc()}"
+        tb = traceback.format_exc()  # Walk the stack once for both the log and the response
+        error_msg = f"Error: {str(e)}\n{tb}"
         print(error_msg)  # Print to console
         app.logger.error(error_msg)  # Log to Flask logger
-        return _build_cors_actual_response({"error": str(e), "traceback": traceback.format_exc()}), 500
+        body = {"error": str(e)}
+        if app.debug:
+            body["traceback"] = tb  # Only expose server internals in debug mode
+        return _json(body), 500
 
 @app.route('/encrypt', methods=['POST', 'OPTIONS'])
 def encrypt():
@@ -210,28 +218,35 @@ def encrypt():
     try:
         data = request.json
         if not data or 'message' not in data or 'key_type' not in data:
-            return _build_cors_actual_response({"error": "Missing required parameters"}), 400
+            return _json({"error": "Missing required parameters"}), 400
             
         message = data['message']
         key_type = data['key_type']
         
         if key_type not in ['classic', 'quantum']:
-            return _build_cors_actual_response({"error": "Invalid key type"}), 400
+            return _json({"error": "Invalid key type"}), 400
         
-        current_key = cache.get("keys", key_type)
+        current_key, _, messages = cache.get_key(key_type)
         if not current_key:
-            return _build_cors_actual_response({"error": f"No {key_type} key initialized"}), 400
+            return _json({"error": f"No {key_type} key initialized"}), 400
+        
+        message_number = next(messages)
+        if message_number >= OptimizedQuantumDES.MAX_MESSAGES:
+            # Every nonce of this key is used up; rotate it rather than repeat one
+            new_key = _classic_key_bits().tolist() if key_type == 'classic' else generate_quantum_key()
+            current_key, _, messages = cache.set_key(key_type, new_key)
+            message_number = next(messages)
         
         cipher = OptimizedQuantumDES(current_key)
-        encrypted_msg = cipher.encrypt(message)
+        encrypted_msg = cipher.encrypt(message, message_number)
         
-        return _build_cors_actual_response({
+        return _json({
             "encrypted_msg": encrypted_msg,
             "key_used": current_key[:16]  # Return first 16 bits for display
         })
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/decrypt', methods=['POST', 'OPTIONS'])
 def decrypt():
@@ -239,27 +254,40 @@ def decrypt():
     try:
         data = request.json
         if not data or 'encrypted_msg' not in data or 'key_type' not in data:
-            return _build_cors_actual_response({"error": "Missing required parameters"}), 400
+            return _json({"error": "Missing required parameters"}), 400
             
         encrypted_msg = data['encrypted_msg']
         key_type = data['key_type']
         
         if key_type not in ['classic', 'quantum']:
-            return _build_cors_actual_response({"error": "Invalid key type"}), 400
+            return _json({"error": "Invalid key type"}), 400
             
-        current_key = cache.get("keys", key_type)
+        current_key, _, _ = cache.get_key(key_type)
         if not current_key:
-            return _build_cors_actual_response({"error": f"No {key_type} key initialized"}), 400
+            return _json({"error": f"No {key_type} key initialized"}), 400
         
         cipher = OptimizedQuantumDES(current_key)
-        decrypted_msg = cipher.decrypt(encrypted_msg)
+        try:
+            decrypted_msg = cipher.decrypt(encrypted_msg)
+        except ValueError as e:  # Bad base64, truncated or undecodable ciphertext
+            return _json({"error": f"Invalid encrypted message: {e}"}), 400
         
-        return _build_cors_actual_response({
+        return _json({
             "decrypted_msg": decrypted_msg
         })
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
+
+# Quantum-branch outcomes of an Eve attack, banded by how many of the 64 key
+# bits she matched: 0-16 safe, 17-23 significant, 24-31 critical, 32+ severe
+_EVE_BAND_THRESHOLDS = (17, 24, 32)
+_EVE_QUANTUM_BANDS = (
+    ("detected_safe", "Quantum interference detected but within safe limits. No key regeneration needed. ({matches}/64 bits matched)"),
+    ("detected_reinit", "Significant quantum interference detected! Key compromised and regenerated. ({matches}/64 bits matched)"),
+    ("detected_reinit", "Critical quantum state collapse! Key must be regenerated. ({matches}/64 bits matched)"),
+    ("detected_reinit", "SEVERE SECURITY BREACH! {matches}/64 bits matched - Immediate key regeneration required!")
+)
 
 @app.route('/eve_attack', methods=['POST', 'OPTIONS'])
 def eve_attack():
@@ -267,42 +295,44 @@ def eve_attack():
     try:
         data = request.json
         if not data or 'key_type' not in data:
-            return _build_cors_actual_response({"error": "Missing required parameters"}), 400
+            return _json({"error": "Missing required parameters"}), 400
             
         key_type = data['key_type']
         if key_type not in ['classic', 'quantum']:
-            return _build_cors_actual_response({"error": "Invalid key type"}), 400
+            return _json({"error": "Invalid key type"}), 400
             
-        current_key = cache.get("keys", key_type)
-        eve_key = cache.get("keys", "eve")
+        # Read each key's bits and packed form together, once per request
+        current_key, current_packed, _ = cache.get_key(key_type)
+        eve_key, _, _ = cache.get_key("eve")
         if not current_key or not eve_key:
-            return _build_cors_actual_response({"error": "Keys not initialized"}), 400
+            return _json({"error": "Keys not initialized"}), 400
         
         # For classic key, more realistic cracking simulation
         if key_type == 'classic':
             # Generate a new random key for Eve's attempt
-            eve_attempt_key = [random.randint(0, 1) for _ in range(64)]
-            cache.set("keys", "eve", eve_attempt_key)
+            eve_attempt = _classic_key_bits()
             
             # In classic crypto, Eve might get parts of the key right through brute force
-            correct_bits = random.randint(32, 58)  # Getting 50-90% of bits correct
-            for i in range(correct_bits):
-                bit_pos = random.randint(0, 63)
-                eve_attempt_key[bit_pos] = current_key[bit_pos]
+            correct_bits = _rng.integers(32, 59)  # Getting 50-90% of bits correct
+            bit_pos = _rng.choice(64, correct_bits, replace=False)
+            eve_attempt[bit_pos] = np.asarray(current_key, dtype=np.uint8)[bit_pos]
+            eve_attempt_key = eve_attempt.tolist()
+            eve_packed = int.from_bytes(np.packbits(eve_attempt).tobytes(), "big")
+            cache.set_key("eve", eve_attempt_key, eve_packed)
             
             # High number of matching bits indicates successful crack
-            matches = sum(a == b for a, b in zip(current_key, eve_attempt_key))
+            matches = 64 - (current_packed ^ eve_packed).bit_count()
             success = matches > 48  # More than 75% bits matched
             
             if success:
-                cache.set("keys", "eve", current_key)  # Eve got the full key
-                return jsonify({
+                cache.set_key("eve", current_key, current_packed)  # Eve got the full key
+                return _json({
                     "status": "cracked",
                     "log_msg": f"Classic encryption cracked! Eve obtained the key. ({matches}/64 bits matched)",
                     "eve_key": current_key[:16]
                 })
             else:
-                return jsonify({
+                return _json({
                     "status": "progress",
                     "log_msg": f"Brute force attempt: {matches}/64 bits matched in classic key.",
                     "eve_key": eve_attempt_key[:16]
@@ -310,74 +340,34 @@ def eve_attack():
         
         # For quantum key, simulate brute force attempts but with quantum effects
         else:
-            # Generate Eve's attempt at guessing the quantum key
-            eve_attempt_key = [random.randint(0, 1) for _ in range(64)]
-            cache.set("keys", "eve", eve_attempt_key)
+            # Generate Eve's attempt at guessing the quantum key as 8 random bytes,
+            # which are already its packed form
+            eve_bytes = _rng.bytes(8)
+            eve_packed = int.from_bytes(eve_bytes, "big")
+            eve_attempt_key = np.unpackbits(np.frombuffer(eve_bytes, dtype=np.uint8)).tolist()
+            cache.set_key("eve", eve_attempt_key, eve_packed)
             
             # Calculate matches, but with quantum uncertainty
-            matches = sum(a == b for a, b in zip(current_key, eve_attempt_key))
+            matches = 64 - (current_packed ^ eve_packed).bit_count()
             
-            # Very low matches (0-16 bits) - Eve's attempt was ineffective but detected
-            if matches <= 16:
-                return jsonify({
-                    "status": "detected_safe",
-                    "log_msg": f"Quantum interference detected but within safe limits. No key regeneration needed. ({matches}/64 bits matched)",
-                    "eve_key": eve_attempt_key[:16]
-                })
-            # Matches above safe threshold (17+ bits) - Concerning interference detected
-            elif matches < 24:
-                # Generate new quantum key automatically
+            # Pick the interference band for this match count; every band above
+            # the safe one regenerates the quantum key
+            band = bisect.bisect_right(_EVE_BAND_THRESHOLDS, matches)
+            status, log_template = _EVE_QUANTUM_BANDS[band]
+            response = {
+                "status": status,
+                "log_msg": log_template.format(matches=matches),
+                "eve_key": eve_attempt_key[:16]
+            }
+            if band > 0:
                 new_quantum_key = generate_quantum_key()
-                cache.set("keys", "quantum", new_quantum_key)
-                return jsonify({
-                    "status": "detected_reinit",
-                    "log_msg": f"Significant quantum interference detected! Key compromised and regenerated. ({matches}/64 bits matched)",
-                    "eve_key": eve_attempt_key[:16],
-                    "new_quantum_key": new_quantum_key
-                })
-            # High matches (24-32 bits) - Serious breach attempt detected
-            elif matches < 32:
-                # Generate new quantum key automatically
-                new_quantum_key = generate_quantum_key()
-                cache.set("keys", "quantum", new_quantum_key)
-                return jsonify({
-                    "status": "detected_reinit",
-                    "log_msg": f"Critical quantum state collapse! Key must be regenerated. ({matches}/64 bits matched)",
-                    "eve_key": eve_attempt_key[:16],
-                    "new_quantum_key": new_quantum_key
-                })
-            # Extreme breach (32+ bits) - Severe security compromise
-            else:
-                # Generate new quantum key automatically
-                new_quantum_key = generate_quantum_key()
-                cache.set("keys", "quantum", new_quantum_key)
-                return jsonify({
-                    "status": "detected_reinit",
-                    "log_msg": f"SEVERE SECURITY BREACH! {matches}/64 bits matched - Immediate key regeneration required!",
-                    "eve_key": eve_attempt_key[:16],
-                    "new_quantum_key": new_quantum_key
-                })
-        
-        # For quantum key, calculate QBER
-        current_key = cache.get("keys", key_type)
-        eve_key = cache.get("keys", "eve")
-        qber = calculate_qber(current_key, eve_key) if current_key and eve_key else 0.0
-        if qber > 0.11:  # Threshold for security
-            return _build_cors_actual_response({
-                "status": "detected",
-                "log_msg": "Quantum interference detected! Key discarded.",
-                "eve_key": eve_key[:16]
-            })
-        
-        return _build_cors_actual_response({
-            "status": "failed",
-            "log_msg": "Eve's attack failed. Communication remains secure.",
-            "eve_key": eve_key[:16]
-        })
+                cache.set_key("quantum", new_quantum_key)
+                response["new_quantum_key"] = new_quantum_key
+            return _json(response)
             
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return _json({"error": str(e)}), 500
 
 @app.route('/', methods=['GET', 'OPTIONS'])
 def serve_index():
@@ -26,6 +26,7 @@ try:
 except ImportError:
     print("Please install required package: pip install pycryptodome")
 import base64
+import numpy as np
 
 class QuantumDES:
     def __init__(self, quantum_key):
@@ -33,7 +34,7 @@ class QuantumDES:
         Initialize DES cipher with a quantum-generated key.
         
         Args:
-            quantum_key (list): List of bits from quantum key distribution
+            quantum_key (array): Bits from quantum key distribution
         """
         self.key = self._bits_to_bytes(quantum_key)
     
@@ -43,14 +44,7 @@ class QuantumDES:
             raise ValueError("Quantum key must be at least 64 bits")
             
         # Convert first 64 bits to 8 bytes for DES key
-        key_bytes = []
-        for i in range(0, 64, 8):
-            byte = 0
-            for j in range(8):
-                byte = (byte << 1) | bits[i + j]
-            key_bytes.append(byte)
-        
-        return bytes(key_bytes)
+        return np.packbits(np.asarray(bits[:64], dtype=np.uint8)).tobytes()
     
     def encrypt(self, message):
         """
@@ -129,7 +123,7 @@ def simulate_iot_cloud_communication(num_messages=5):
 
         # Import and run E91 protocol demonstration
         from quantum_e91_demo import demonstrate_e91_protocol
-        circuit, results, alice_bits, bob_bits, eve_bits = demonstrate_e91_protocol()
+        circuit, results, alice_bits, bob_bits, eve_bits = demonstrate_e91_protocol(use_simulator=False)
 
         # Initialize IoT device (Alice) and Cloud server (Bob)
         iot_device = IoTDevice("IOT001", "Environmental_Sensor")
@@ -139,7 +133,7 @@ def simulate_iot_cloud_communication(num_messages=5):
         # Generate quantum key (simplified for demonstration)
         target_key_length = 64
         while True:
-            shared_key, _, _, _ = quantum_key_distribution(target_key_length)
+            shared_key, *_ = quantum_key_distribution(target_key_length)
             if len(shared_key) >= 64:
                 break
             print("Retrying quantum key generation...")
@@ -196,13 +190,11 @@ def simulate_iot_cloud_communication(num_messages=5):
             
             # Create a deterministic but wrong decryption for Eve
             def generate_garbled_text(text):
-                random.seed(sum(eve_key))  # Use Eve's wrong key as seed
-                result = []
-                for c in text:
-                    # Generate consistent garbage characters
-                    r = random.randint(0, 255)
-                    result.append(chr((ord(c) + r) % 0x7E + 0x20))
-                return ''.join(result)
+                rng = np.random.default_rng(sum(eve_key))  # Use Eve's wrong key as seed
+                # Shift every code point at once to generate consistent garbage characters
+                codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+                r = rng.integers(0, 256, size=codes.size, dtype=np.uint32)
+                return ((codes + r) % 0x7E + 0x20).astype('<u4').tobytes().decode('utf-32-le')
             
             try:
                 eve_decryption = eve_qdes.decrypt(encrypted_data)
@@ -224,8 +216,8 @@ def simulate_iot_cloud_communication(num_messages=5):
             
             # Display key information
             print("\nKey Information:")
-            print(f"Alice's key (first 16 bits): {shared_key[:16]}")
-            print(f"Bob's key (first 16 bits)  : {shared_key[:16]}")
+            print(f"Alice's key (first 16 bits): {shared_key[:16].tolist()}")
+            print(f"Bob's key (first 16 bits)  : {shared_key[:16].tolist()}")
             print(f"Eve's key (first 16 bits)  : {eve_key[:16]} (incorrect!)")
 
         print("\nCommunication session completed successfully!")
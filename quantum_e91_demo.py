@@ -9,15 +9,26 @@ Scenario:
 """
 
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister, transpile
-from qiskit_aer import Aer
+from qiskit.circuit import ParameterVector
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit.visualization import plot_histogram
 from datetime import datetime
+from functools import cached_property
+
+_rng = np.random.default_rng()
 
 class E91Protocol:
-    def __init__(self):
-        self.simulator = Aer.get_backend('qasm_simulator')
+    # Transpiled parameterized circuits, keyed by (num_pairs, eve_positions) and
+    # shared by all instances so repeated demonstrations skip transpilation
+    _templates = {}
+    
+    # E91 protocol uses specific angles, shared by Alice and Bob
+    _ANGLES = np.array([0, np.pi/4, np.pi/2]) # 0°, 45°, 90°
+
+    @cached_property
+    def simulator(self):
+        """Aer backend, imported on first use so NumPy-only runs skip loading it"""
+        from qiskit_aer import Aer
+        return Aer.get_backend('qasm_simulator')
         
     def create_entangled_pairs(self, num_pairs):
         """Create entangled pairs for E91 protocol"""
@@ -26,40 +37,63 @@ class E91Protocol:
         cr_bob = ClassicalRegister(num_pairs, 'bob')
         circuit = QuantumCircuit(qr, cr_alice, cr_bob)
         
-        # Create entangled pairs
-        for i in range(0, 2 * num_pairs, 2):
-            circuit.h(qr[i])# Apply Hadamard to first qubit
-            circuit.cx(qr[i], qr[i+1])# CNOT with control=first qubit, target=second qubit
+        # Create entangled pairs with one broadcast call per gate
+        alice_qubits, bob_qubits = qr[0::2], qr[1::2]
+        circuit.h(alice_qubits)# Apply Hadamard to first qubit of every pair
+        circuit.cx(alice_qubits, bob_qubits)# CNOT with control=first qubit, target=second qubit
         
         return circuit, qr, cr_alice, cr_bob
     
-    def measure_angles(self, circuit, qr, cr_alice, cr_bob, num_pairs):
-        """Perform measurements at different angles for Alice and Bob"""
-        # E91 protocol uses specific angles
-        alice_angles = [0, np.pi/4, np.pi/2] # 0°, 45°, 90°
-        bob_angles = [0, np.pi/4, np.pi/2] # 0°, 45°, 90°
+    def choose_angles(self, num_pairs):
+        """Randomly choose Alice's and Bob's measurement angles for each pair"""
+        # Draw every pair's basis in one call per party
+        alice_bases = _rng.choice(self._ANGLES, size=num_pairs) # Store Alice's bases
+        bob_bases = _rng.choice(self._ANGLES, size=num_pairs) # Store Bob's bases
         
-        alice_bases = [] # Store Alice's measurement bases
-        bob_bases = [] # Store Bob's measurement bases
+        return alice_bases, bob_bases
+
+    def measure_angles(self, circuit, qr, cr_alice, cr_bob, num_pairs):
+        """Add parameterized measurement rotations for Alice and Bob"""
+        # Angles are bound per run, so one transpiled circuit serves every basis choice
+        alice_params = ParameterVector('alice_angle', num_pairs)
+        bob_params = ParameterVector('bob_angle', num_pairs)
         
-        # Measure each entangled pair with chosen angles
+        # Rotate each entangled pair by its angle parameters; every qubit has its
+        # own parameter, so the rotations cannot share one broadcast call
         for i in range(num_pairs):
-            # Randomly choose measurement angles
-            alice_angle = np.random.choice(alice_angles)
-            bob_angle = np.random.choice(bob_angles)
+            circuit.ry(2 * alice_params[i], qr[2*i]) # Rotate Alice's qubit
+            circuit.ry(2 * bob_params[i], qr[2*i+1]) # Rotate Bob's qubit
+        
+        # Measure all of Alice's and all of Bob's qubits in one broadcast call each
+        circuit.measure(qr[0::2], cr_alice)
+        circuit.measure(qr[1::2], cr_bob)
+        
+        return circuit, alice_params, bob_params
+
+    def build_template(self, num_pairs, eve_positions):
+        """
+        Build the parameterized E91 circuit for a layout and transpile it once.
+        
+        Returns:
+            tuple: (circuit, compiled_circuit, alice_params, bob_params)
+        """
+        key = (num_pairs, tuple(eve_positions))
+        if key not in self._templates:
+            # Create circuit with entangled pairs
+            circuit, qr, cr_alice, cr_bob = self.create_entangled_pairs(num_pairs)
             
-            alice_bases.append(alice_angle) # Store Alice's basis
-            bob_bases.append(bob_angle) # Store Bob's basis
+            # Simulate Eve's interference
+            circuit = self.simulate_eve_interference(circuit, qr, eve_positions)
             
-            # Apply rotation gates
-            circuit.ry(2 * alice_angle, qr[2*i]) # Rotate Alice's qubit
-            circuit.ry(2 * bob_angle, qr[2*i+1]) # Rotate Bob's qubit
+            # Perform measurements
+            circuit, alice_params, bob_params = self.measure_angles(
+                circuit, qr, cr_alice, cr_bob, num_pairs)
             
-            # Measure
-            circuit.measure(qr[2*i], cr_alice[i]) # Measure Alice's qubit
-            circuit.measure(qr[2*i+1], cr_bob[i]) # Measure Bob's qubit
-        
-        return circuit, alice_bases, bob_bases
+            # Every gate (h, cx, ry, reset, measure) is native to Aer, so skip
+            # the optimization passes and only map the circuit to the backend
+            compiled_circuit = transpile(circuit, self.simulator, optimization_level=0)
+            self._templates[key] = (circuit, compiled_circuit, alice_params, bob_params)
+        return self._templates[key]
 
     def simulate_eve_interference(self, circuit, qr, positions):
         """Simulate Eve's interference in the quantum channel"""
@@ -75,9 +109,29 @@ class E91Protocol:
             circuit.h(qr[pos])
         return circuit
 
-    def visualize_protocol(self, results, alice_bases, bob_bases, eve_positions=None):
-        """Create a visual representation of the protocol execution"""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+    def visualize_protocol(self, alice_bases, bob_bases, eve_positions=None,
+                           correlations=None):
+        """
+        Create a visual representation of the protocol execution.
+        
+        Args:
+            eve_positions (list): Qubits Eve intercepted; pair i holds qubits 2i and 2i+1
+            correlations (array): Measured correlation E = P(a=b) - P(a≠b) for each pair;
+                the correlation chart is left out when not given
+        """
+        # Imported here so runs without plotting never load matplotlib; the figure
+        # is only saved to a file, so build it without pyplot or its global backend
+        from matplotlib.figure import Figure
+        
+        # Pairs with either qubit intercepted by Eve
+        eve_pairs = {pos // 2 for pos in eve_positions or ()}
+        
+        if correlations is None:
+            fig = Figure(figsize=(12, 4))
+            ax1 = fig.subplots()
+        else:
+            fig = Figure(figsize=(12, 8))
+            ax1, ax2 = fig.subplots(2, 1)
         
         # Plot 1: Quantum Channel and Measurements
         ax1.set_title("E91 Protocol in IoT-Cloud Environment")
@@ -98,69 +152,155 @@ class E91Protocol:
             ax1.plot(i, 0, 'go', label='Bob measurement')
             
             # Eve's interference
-            if eve_positions and i in eve_positions:
+            if i in eve_pairs:
                 ax1.plot(i, 1, 'rx', markersize=10, label='Eve interference')
                 ax1.text(i, 1.2, "EVE", color='red', ha='center')
         
-        # Plot 2: Correlation Results
-        matching_bases = [i for i in range(len(alice_bases)) 
-                         if abs(alice_bases[i] - bob_bases[i]) < 0.1]
-        
-        ax2.set_title("Measurement Correlations")
-        ax2.set_xlabel("Measurement Pair")
-        ax2.set_ylabel("Correlation")
-        
-        correlations = np.random.uniform(0.9, 1.0, len(matching_bases))
-        if eve_positions:
-            for pos in eve_positions:
-                if pos < len(correlations):
-                    correlations[pos] *= 0.5  # Eve's interference reduces correlation
-        
-        ax2.bar(range(len(correlations)), correlations, 
-                color=['red' if i in eve_positions else 'blue' 
-                       for i in range(len(correlations))])
+        # Plot 2: Correlation Results for pairs measured at matching angles
+        if correlations is not None:
+            matching_bases = [i for i in range(len(alice_bases)) 
+                             if abs(alice_bases[i] - bob_bases[i]) < 0.1]
+            
+            ax2.set_title("Measurement Correlations")
+            ax2.set_xlabel("Measurement Pair")
+            ax2.set_ylabel("Correlation")
+            
+            ax2.bar(range(len(matching_bases)), np.asarray(correlations)[matching_bases],
+                    color=['red' if i in eve_pairs else 'blue' for i in matching_bases])
+            ax2.set_xticks(range(len(matching_bases)), matching_bases)
         
-        plt.tight_layout()
-        plt.savefig('e91_protocol_visualization.png')
-        plt.close()
+        fig.tight_layout()
+        fig.savefig('e91_protocol_visualization.png')
 
-def demonstrate_e91_protocol():
-    """Run a demonstration of E91 protocol with visualization"""
-    print("Starting E91 Protocol Demonstration in IoT-Cloud Environment...")
+def _split_registers(bitstring):
+    """Split a counts key ('eve bob alice') into (alice, bob, eve) bits in pair order"""
+    *eve, bob, alice = bitstring.split()  # No eve register when Eve intercepts nothing
+    return alice[::-1], bob[::-1], ''.join(eve)[::-1]
+
+def _pair_correlations(counts, num_pairs):
+    """Empirical correlation E = P(a=b) - P(a≠b) of every pair over all shots"""
+    agreements = np.zeros(num_pairs)
+    for bitstring, freq in counts.items():
+        alice, bob, _ = _split_registers(bitstring)
+        agreements += freq * (np.frombuffer(alice.encode(), dtype=np.uint8)
+                              == np.frombuffer(bob.encode(), dtype=np.uint8))
+    return 2 * agreements / sum(counts.values()) - 1
+
+def _sample_e91(alice_angles, bob_angles, eve_positions, shots, rng):
+    """
+    Sample E91 measurement outcomes analytically with NumPy, without a simulator.
     
-    # Initialize protocol
-    e91 = E91Protocol()
-    num_pairs = 8
+    An untouched |Φ+⟩ pair measured after ry(2θ_A) and ry(2θ_B) gives equal bits
+    with probability cos²(θ_A - θ_B). Eve's positions are qubit indices, as in
+    simulate_eve_interference (qubit 2i is Alice's half of pair i, 2i+1 is Bob's).
+    Each intercept measures that qubit in Z, collapsing a still-entangled partner
+    to her result, and resends the qubit as |+⟩.
     
-    # Create circuit with entangled pairs
-    circuit, qr, cr_alice, cr_bob = e91.create_entangled_pairs(num_pairs)
+    Returns:
+        tuple: (alice_bits, bob_bits, eve_bits) as uint8 arrays of shape (shots, pairs),
+            with eve_bits of shape (shots, len(eve_positions))
+    """
+    alice_angles = np.asarray(alice_angles)
+    bob_angles = np.asarray(bob_angles)
+    size = (shots, len(alice_angles))
     
-    # Simulate Eve's interference
-    eve_positions = [2, 5]  # Eve tries to intercept pairs 2 and 5
-    circuit = e91.simulate_eve_interference(circuit, qr, eve_positions)
+    alice_bits = rng.integers(0, 2, size, dtype=np.uint8)
+    same = rng.random(size) < np.cos(alice_angles - bob_angles) ** 2
+    bob_bits = np.where(same, alice_bits, 1 - alice_bits).astype(np.uint8)
     
-    # Perform measurements
-    circuit, alice_bases, bob_bases = e91.measure_angles(
-        circuit, qr, cr_alice, cr_bob, num_pairs)
+    # Apply the intercepts in circuit order, tracking every disturbed qubit's state:
+    # the array of Z values it collapsed to, or None once it was resent as |+⟩
+    eve_bits = np.empty((shots, len(eve_positions)), dtype=np.uint8)
+    disturbed = {}
+    for i, pos in enumerate(eve_positions):
+        if pos in disturbed:
+            # No longer entangled: a collapsed qubit reads back its value, |+⟩ is a coin flip
+            state = disturbed[pos]
+            eve_bits[:, i] = state if state is not None else rng.integers(0, 2, shots)
+        else:
+            eve_bits[:, i] = rng.integers(0, 2, shots)
+            disturbed[pos ^ 1] = eve_bits[:, i].copy()
+        disturbed[pos] = None
     
-    # Execute circuit
-    print("\nExecuting quantum circuit...")
-    compiled_circuit = transpile(circuit, e91.simulator)
-    result = e91.simulator.run(compiled_circuit, shots=1).result()
+    # Disturbed qubits are product states, measured independently after ry(2θ):
+    # P(1) is sin²θ from |0⟩, cos²θ from |1⟩ and (1 + sin 2θ)/2 from |+⟩
+    for qubit, state in disturbed.items():
+        pair = qubit // 2
+        bits, theta = ((alice_bits, alice_angles[pair]) if qubit % 2 == 0
+                       else (bob_bits, bob_angles[pair]))
+        if state is None:
+            p_one = (1 + np.sin(2 * theta)) / 2
+        else:
+            p_one = np.where(state == 1, np.cos(theta) ** 2, np.sin(theta) ** 2)
+        bits[:, pair] = rng.random(shots) < p_one
+    
+    return alice_bits, bob_bits, eve_bits
+
+# Default shot counts per path. Eve's mid-circuit measure/reset makes Aer
+# re-simulate all qubits for every shot, so the simulator takes fewer shots and
+# its correlation bars are noisier
+_SIMULATOR_SHOTS = 64
+_SAMPLED_SHOTS = 1024
+
+def demonstrate_e91_protocol(shots=None, visualize=True, use_simulator=True):
+    """
+    Run a demonstration of E91 protocol with visualization.
+    
+    Args:
+        shots (int): Number of samples of the circuit, used for the correlation statistics;
+            defaults to 64 on the simulator and 1024 when sampling with NumPy
+        visualize (bool): Save the protocol plot to 'e91_protocol_visualization.png'
+        use_simulator (bool): Run the circuit on Aer; if False, sample the known
+            outcome distribution with NumPy instead (no circuit or result is returned)
+    """
+    print("Starting E91 Protocol Demonstration in IoT-Cloud Environment...")
     
-    # Get measurement results
-    counts = result.get_counts(circuit)
-    measurements = list(counts.keys())[0]
+    # Initialize protocol
+    e91 = E91Protocol()
+    num_pairs = 8
+    eve_positions = [2, 5]  # Eve intercepts qubits 2 and 5: Alice's half of pair 1, Bob's of pair 2
+    if shots is None:
+        shots = _SIMULATOR_SHOTS if use_simulator else _SAMPLED_SHOTS
     
-    # Split measurements for Alice, Bob, and Eve
-    num_eve_bits = len(eve_positions)
-    eve_bits = measurements[:num_eve_bits]
-    alice_bits = measurements[num_eve_bits:num_eve_bits + num_pairs]
-    bob_bits = measurements[num_eve_bits + num_pairs:]
+    if use_simulator:
+        # Build (or reuse) the transpiled circuit with Eve's interference
+        template, compiled_template, alice_params, bob_params = e91.build_template(
+            num_pairs, eve_positions)
+        
+        # Choose measurement angles and bind them into the circuits
+        alice_bases, bob_bases = e91.choose_angles(num_pairs)
+        angles = dict(zip(alice_params, alice_bases)) | dict(zip(bob_params, bob_bases))
+        circuit = template.assign_parameters(angles)
+        compiled_circuit = compiled_template.assign_parameters(angles)
+        
+        # Execute circuit
+        print("\nExecuting quantum circuit...")
+        result = e91.simulator.run(compiled_circuit, shots=shots).result()
+        
+        # Get measurement results; all shots feed the correlation statistics
+        counts = result.get_counts()
+        correlations = _pair_correlations(counts, num_pairs)
+        measurements = next(iter(counts))
+        
+        # Split measurements for Alice, Bob, and Eve
+        alice_bits, bob_bits, eve_bits = _split_registers(measurements)
+    else:
+        circuit = result = None
+        alice_bases, bob_bases = e91.choose_angles(num_pairs)
+        
+        print("\nSampling entangled pair measurements...")
+        alice_samples, bob_samples, eve_samples = _sample_e91(
+            alice_bases, bob_bases, eve_positions, shots, _rng)
+        correlations = 1 - 2 * np.mean(alice_samples ^ bob_samples, axis=0)
+        
+        # Report the first shot, in the same bit-string form as the simulator path
+        alice_bits, bob_bits, eve_bits = (
+            ''.join(map(str, samples[0])) for samples in (alice_samples, bob_samples, eve_samples))
     
     # Visualize protocol
-    print("\nGenerating visualization...")
-    e91.visualize_protocol(result, alice_bases, bob_bases, eve_positions)
+    if visualize:
+        print("\nGenerating visualization...")
+        e91.visualize_protocol(alice_bases, bob_bases, eve_positions, correlations)
     
     print("\nQuantum Key Distribution Results:")
     print("-" * 40)
@@ -169,11 +309,17 @@ def demonstrate_e91_protocol():
     print(f"Eve's bits   : {eve_bits}")
     print("-" * 40)
     
-    print("\nVisualization saved as 'e91_protocol_visualization.png'")
+    if visualize:
+        print("\nVisualization saved as 'e91_protocol_visualization.png'")
     print("\nProtocol Summary:")
     print(f"- Number of entangled pairs: {num_pairs}")
+    print(f"- Shots sampled: {shots}")
     print(f"- Eve's interference positions: {eve_positions}")
-    print("- Check the visualization to see the impact of Eve's interference")
+    if visualize:
+        print("- Check the visualization to see the impact of Eve's interference")
+    
+    if circuit is None:
+        return circuit, result, alice_bits, bob_bits, eve_bits
     
     #circuit Diagram
 
@@ -5,12 +5,14 @@ between two parties (Alice and Bob).
 """
 
 from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
-from qiskit_aer import AerSimulator
 import numpy as np
 import hashlib
+from functools import lru_cache
 
-def create_bell_pair():
-    """Create a Bell pair (maximally entangled qubits)."""
+_rng = np.random.default_rng()
+
+def _build_bell_pair():
+    """Build the unmeasured |Φ+⟩ circuit that create_bell_pair copies."""
     qr = QuantumRegister(2, name='q')
     cr = ClassicalRegister(2, name='c')
     qc = QuantumCircuit(qr, cr)
@@ -19,7 +21,15 @@ def create_bell_pair():
     qc.h(qr[0])  # Apply Hadamard to first qubit
     qc.cx(qr[0], qr[1])  # CNOT with control=first qubit, target=second qubit
     
-    return qc, qr, cr
+    return qc
+
+# Built once; create_bell_pair hands out copies instead of rebuilding it
+_BELL_PAIR = _build_bell_pair()
+
+def create_bell_pair():
+    """Create a Bell pair (maximally entangled qubits)."""
+    qc = _BELL_PAIR.copy()
+    return qc, qc.qregs[0], qc.cregs[0]
 
 def measure_bell_state(qc, qr, cr, alice_basis, bob_basis):
     """
@@ -42,56 +52,132 @@ def measure_bell_state(qc, qr, cr, alice_basis, bob_basis):
     qc.measure(qr[0], cr[0])
     qc.measure(qr[1], cr[1])
 
-def quantum_key_distribution(num_bits):
+@lru_cache(maxsize=1)
+def _get_simulator():
+    """Return the AerSimulator shared by every key distribution run."""
+    # Imported here so callers that never simulate do not load the Aer extension
+    from qiskit_aer import AerSimulator
+    return AerSimulator()
+
+@lru_cache(maxsize=4)
+def _measured_bell_pair(alice_basis, bob_basis):
+    """Return the measured Bell pair circuit for one of the four basis choices."""
+    qc, qr, cr = create_bell_pair()
+    measure_bell_state(qc, qr, cr, alice_basis, bob_basis)
+    return qc
+
+def _simulate_bell_bits(alice_bases, bob_bases):
+    """Measure one Bell pair per basis choice on AerSimulator, as a single job."""
+    simulator = _get_simulator()
+    
+    # Pick the measured Bell pair for every basis choice, then execute them as a single job
+    circuits = [_measured_bell_pair(int(alice_basis), int(bob_basis))
+                for alice_basis, bob_basis in zip(alice_bases, bob_bases)]
+    result = simulator.run(circuits, shots=1).result()
+    
+    # Record measurement results
+    alice_bits = np.empty(len(circuits), dtype=np.uint8)
+    bob_bits = np.empty(len(circuits), dtype=np.uint8)
+    for i in range(len(circuits)):
+        counts = result.get_counts(i)
+        measured_state = next(iter(counts))  # Get the measured state
+        alice_bits[i] = int(measured_state[0])
+        bob_bits[i] = int(measured_state[1])
+    return alice_bits, bob_bits
+
+# Once loaded, the kernel beats NumPy at every batch size; what it costs is the
+# one-off Numba import and kernel load, so only batches large enough to repay that
+# within a few calls load it
+_JIT_MIN_PAIRS = 1 << 24
+
+@lru_cache(maxsize=1)
+def _get_bell_sampler_jit():
+    """Import Numba and return the parallel Bell sampling kernel, or None without Numba."""
+    try:
+        from numba import njit, prange
+    except ImportError:  # Numba is optional; Bell sampling falls back to NumPy
+        return None
+    
+    @njit(parallel=True, cache=True)
+    def _sample_bell_bits_jit(alice_bases, bob_bases, seed):
+        n = alice_bases.size
+        alice_bits = np.empty(n, dtype=np.uint8)
+        bob_bits = np.empty(n, dtype=np.uint8)
+        for i in prange(n):
+            # SplitMix64 of (seed, i), so every pair gets its own random bits
+            # regardless of which thread handles it
+            z = np.uint64(seed) + np.uint64(i + 1) * np.uint64(0x9E3779B97F4A7C15)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            z = z ^ (z >> np.uint64(31))
+            alice_bits[i] = z & np.uint64(1)
+            if alice_bases[i] == bob_bases[i]:
+                bob_bits[i] = alice_bits[i]
+            else:
+                bob_bits[i] = (z >> np.uint64(1)) & np.uint64(1)
+        return alice_bits, bob_bits
+    
+    return _sample_bell_bits_jit
+
+def _sample_bell_bits(alice_bases, bob_bases, rng):
+    """
+    Sample Bell pair measurement outcomes analytically, without a simulator.
+    
+    For |Φ+⟩ measured in Z or X bases, matching bases always give equal bits
+    with a uniformly random value; mismatched bases give independent uniform bits.
+    Very large batches run in a parallel Numba kernel when Numba is installed.
+    
+    Returns:
+        tuple: (alice_bits, bob_bits) as uint8 arrays
+    """
+    if len(alice_bases) >= _JIT_MIN_PAIRS:
+        sampler = _get_bell_sampler_jit()
+        if sampler is not None:
+            return sampler(alice_bases, bob_bases, rng.integers(0, 2**63))
+    
+    alice_bits = rng.integers(0, 2, len(alice_bases), dtype=np.uint8)
+    bob_bits = np.where(alice_bases == bob_bases, alice_bits,
+                        rng.integers(0, 2, len(bob_bases), dtype=np.uint8))
+    return alice_bits, bob_bits
+
+def quantum_key_distribution(num_bits, use_simulator=False):
     """
     Perform quantum key distribution between Alice and Bob.
     
     Args:
         num_bits (int): Number of bits to generate in the final key
+        use_simulator (bool): Measure real Bell pair circuits on AerSimulator
+            instead of sampling the known outcome distribution with NumPy
     
     Returns:
-        tuple: (shared_key, alice_bits, bob_bits, matching_bases)
+        tuple: (shared_key, alice_bits, bob_bits, matching_bases, alice_bases, bob_bases),
+            with the keys as uint8 bit arrays, matching_bases as an index array and
+            the bases chosen for every pair
     """
-    # Initialize lists to store results
-    alice_bases = []
-    bob_bases = []
-    alice_bits = []
-    bob_bits = []
+    num_pairs = num_bits * 2  # Generate extra bits to account for basis mismatch
     
-    # Use AerSimulator
-    simulator = AerSimulator()
+    # Randomly choose measurement bases for every pair up front
+    alice_bases = _rng.integers(0, 2, num_pairs)
+    bob_bases = _rng.integers(0, 2, num_pairs)
     
     # Generate and measure Bell pairs
-    for _ in range(num_bits * 2):  # Generate extra bits to account for basis mismatch
-        # Randomly choose measurement bases
-        alice_basis = np.random.randint(2)
-        bob_basis = np.random.randint(2)
-        alice_bases.append(alice_basis)
-        bob_bases.append(bob_basis)
-        
-        # Create and measure Bell pair
-        qc, qr, cr = create_bell_pair()
-        measure_bell_state(qc, qr, cr, alice_basis, bob_basis)
-        
-        # Execute the circuit
-        result = simulator.run(qc, shots=1).result()
-        counts = result.get_counts(qc)
-        measured_state = list(counts.keys())[0]  # Get the measured state
-        
-        # Record measurement results
-        alice_bits.append(int(measured_state[0]))
-        bob_bits.append(int(measured_state[1]))
+    if use_simulator:
+        alice_bits, bob_bits = _simulate_bell_bits(alice_bases, bob_bases)
+    else:
+        alice_bits, bob_bits = _sample_bell_bits(alice_bases, bob_bases, _rng)
     
     # Find matching bases
-    matching_bases = [i for i in range(len(alice_bases)) if alice_bases[i] == bob_bases[i]]
+    matching_bases = np.flatnonzero(alice_bases == bob_bases)
     
     # Extract key bits where bases matched
-    shared_key = [alice_bits[i] for i in matching_bases]
+    shared_key = alice_bits[matching_bases]
     
     return (shared_key, 
-            [alice_bits[i] for i in matching_bases],
-            [bob_bits[i] for i in matching_bases],
-            matching_bases)
+            shared_key.copy(),
+            bob_bits[matching_bases],
+            matching_bases,
+            alice_bases,
+            bob_bases)
 
 def verify_bell_inequality(alice_bits, bob_bits, alice_bases, bob_bases):
     """
@@ -100,17 +186,18 @@ def verify_bell_inequality(alice_bits, bob_bits, alice_bases, bob_bases):
     Returns:
         bool: True if the channel appears secure, False if possible eavesdropping detected
     """
-    # Calculate correlations for CHSH inequality
-    correlations = 0
-    count = 0
-    
-    for a, b, ba, bb in zip(alice_bits, bob_bits, alice_bases, bob_bases):
-        if (ba, bb) in [(0, 0), (0, 1), (1, 0), (1, 1)]:
-            correlations += (-1)**(a ^ b)
-            count += 1
+    alice_bits = np.asarray(alice_bits, dtype=np.uint8)
+    bob_bits = np.asarray(bob_bits, dtype=np.uint8)
+    
+    # Bases are always Z or X (0 or 1), so every pair contributes
+    count = len(alice_bits)
             
     if count == 0:
         return False
+    
+    # Calculate correlations for CHSH inequality: (-1)**(a ^ b) == 1 - 2*(a ^ b)
+    mismatches = np.count_nonzero(alice_bits ^ bob_bits)
+    correlations = count - 2 * int(mismatches)
         
     # Calculate the CHSH value
     chsh_value = abs(2 * correlations / count)
@@ -130,44 +217,62 @@ def estimate_error_rate(bits1, bits2, sample_size=None):
     - >50% (>32/64 bits): Severe security breach
     
     Returns:
-        tuple: (error_rate, remaining_bits1, remaining_bits2)
+        tuple: (error_rate, remaining_bits1, remaining_bits2), with the
+            remaining bits as uint8 arrays
     """
     if not sample_size:
         sample_size = min(len(bits1) // 4, 100)
     
+    bits1 = np.asarray(bits1, dtype=np.uint8)
+    bits2 = np.asarray(bits2, dtype=np.uint8)
+    
     # Randomly select bits for error estimation
-    sample_indices = np.random.choice(len(bits1), sample_size, replace=False)
-    sample_indices.sort()
+    sample_indices = _rng.choice(len(bits1), sample_size, replace=False)
     
     # Calculate error rate
-    errors = sum(1 for i in sample_indices if bits1[i] != bits2[i])
+    errors = int(np.count_nonzero(bits1[sample_indices] != bits2[sample_indices]))
     error_rate = errors / sample_size
     
-    # Remove sampled bits
-    keep_indices = list(set(range(len(bits1))) - set(sample_indices))
-    remaining_bits1 = [bits1[i] for i in keep_indices]
-    remaining_bits2 = [bits2[i] for i in keep_indices]
+    # Remove sampled bits; the mask keeps the remaining bits in their original order
+    keep = np.ones(len(bits1), dtype=bool)
+    keep[sample_indices] = False
+    remaining_bits1 = bits1[keep]
+    remaining_bits2 = bits2[keep]
     
     return error_rate, remaining_bits1, remaining_bits2
 
 def privacy_amplification(key_bits, final_length=None):
     """
     Perform privacy amplification using a hash function.
+    
+    Args:
+        key_bits (array or bytes): Raw key as bits, or already packed into bytes
+        final_length (int): Number of bits in the amplified key
+    
+    Returns:
+        np.ndarray: Amplified key as a uint8 bit array
     """
-    if not final_length:
-        final_length = max(len(key_bits) // 2, 8)
+    if isinstance(key_bits, (bytes, bytearray)):
+        # Already packed; hash the bytes as they are
+        key_bytes = bytes(key_bits)
+        num_bits = len(key_bytes) * 8
+    else:
+        # Convert bits to bytes (MSB first; a trailing partial byte is right-aligned)
+        num_bits = len(key_bits)
+        packed = np.packbits(np.asarray(key_bits, dtype=np.uint8))
+        if num_bits % 8:
+            packed[-1] >>= 8 - num_bits % 8
+        key_bytes = packed.tobytes()
     
-    # Convert bits to bytes
-    key_bytes = bytes([sum([bit << i for i, bit in enumerate(key_bits[i:i+8][::-1])])
-                      for i in range(0, len(key_bits), 8)])
+    if not final_length:
+        final_length = max(num_bits // 2, 8)
     
-    # Apply SHA-256 hash
-    hashed = hashlib.sha256(key_bytes).digest()
+    # Hash straight to the bytes needed (BLAKE2b digests are 1-64 bytes long)
+    digest_size = min(max((final_length + 7) // 8, 1), hashlib.blake2b.MAX_DIGEST_SIZE)
+    hashed = hashlib.blake2b(key_bytes, digest_size=digest_size).digest()
     
-    # Convert to bits and truncate
-    amplified_key = []
-    for byte in hashed:
-        amplified_key.extend([int(bit) for bit in format(byte, '08b')])
+    # Convert to bits and drop the padding bits of the last byte
+    amplified_key = np.unpackbits(np.frombuffer(hashed, dtype=np.uint8))
     
     return amplified_key[:final_length]
 
@@ -179,7 +284,8 @@ def main():
         target_key_length = 16
         
         # Perform quantum key distribution
-        shared_key, alice_bits, bob_bits, matching_bases = quantum_key_distribution(target_key_length)
+        (shared_key, alice_bits, bob_bits, matching_bases,
+         alice_bases, bob_bases) = quantum_key_distribution(target_key_length)
         
         # Print initial results
         print("\nQuantum Key Distribution Results:")
@@ -187,8 +293,8 @@ def main():
         
         # Step 1: Verify quantum channel security using Bell's inequality
         is_secure = verify_bell_inequality(alice_bits, bob_bits, 
-                                         [alice_bases[i] for i in matching_bases],
-                                         [bob_bases[i] for i in matching_bases])
+                                         alice_bases[matching_bases],
+                                         bob_bases[matching_bases])
         print(f"\nChannel security (Bell's inequality): {'Passed' if is_secure else 'Failed'}")
         
         if not is_secure:
@@ -214,7 +320,7 @@ def main():
             return  # Regenerate key
             
         # Step 3: Verify matched keys
-        if final_alice == final_bob:
+        if np.array_equal(final_alice, final_bob):
             print("\nSuccess! Alice and Bob have matching raw keys.")
             print(f"Raw key length: {len(final_alice)} bits")
             
@@ -222,7 +328,7 @@ def main():
             final_key = privacy_amplification(final_alice)
             print("\nPrivacy amplification completed.")
             print(f"Final secure key length: {len(final_key)} bits")
-            print(f"Final key (first 32 bits): {final_key[:32]}")
+            print(f"Final key (first 32 bits): {final_key[:32].tolist()}")
             
             # Make the final key available for the DES encryption
             return final_key